@@ -547,10 +547,12 @@ class JobAnnotation:
         self.create(task_data.data.slice(self.start_frame, self.stop_frame).serialize())
 
 class TaskAnnotation:
-    def __init__(self, pk):
-        self.db_task = models.Task.objects.prefetch_related(
-            Prefetch('data__images', queryset=models.Image.objects.order_by('frame'))
-        ).get(id=pk)
+    def __init__(self, pk, db_task=None):
+        if db_task is None:
+            db_task = models.Task.objects.prefetch_related(
+                Prefetch('data__images', queryset=models.Image.objects.order_by('frame'))
+            ).get(id=pk)
+        self.db_task = db_task
 
         # Postgres doesn't guarantee an order by default without explicit order_by
         self.db_jobs = models.Job.objects.select_related("segment").filter(segment__task_id=pk).order_by('id')
@@ -691,8 +693,10 @@ def export_job(job_id, dst_file, format_name,
 
 @silk_profile(name="GET task data")
 @transaction.atomic
-def get_task_data(pk):
-    annotation = TaskAnnotation(pk)
+def get_task_data(pk, db_task=None):
+    # Frames of the task aren't required to read annotations, so
+    # an already fetched task can be used
+    annotation = TaskAnnotation(pk, db_task=db_task)
     annotation.init_from_db()
 
     return annotation.data
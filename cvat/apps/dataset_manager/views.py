@@ -6,6 +6,7 @@ import os
 import os.path as osp
 import tempfile
 from datetime import timedelta
+from functools import lru_cache
 
 import django_rq
 from datumaro.util.os_util import make_file_name
@@ -127,6 +128,22 @@ def get_export_formats():
 def get_import_formats():
     return list(IMPORT_FORMATS.values())
 
+# Formats are registered when the registry module is imported,
+# so the lookup tables don't change after they are built
+@lru_cache(maxsize=None)
+def _get_export_formats_by_display_name():
+    return {f.DISPLAY_NAME: f for f in get_export_formats()}
+
+@lru_cache(maxsize=None)
+def _get_import_formats_by_display_name():
+    return {f.DISPLAY_NAME: f for f in get_import_formats()}
+
+def find_export_format(display_name):
+    return _get_export_formats_by_display_name().get(display_name)
+
+def find_import_format(display_name):
+    return _get_import_formats_by_display_name().get(display_name)
+
 def get_all_formats():
     return {
         'importers': get_import_formats(),
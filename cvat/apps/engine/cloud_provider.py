@@ -2,7 +2,9 @@
 #
 # SPDX-License-Identifier: MIT
 
+import functools
 import os
+import threading
 import boto3
 
 from abc import ABC, abstractmethod, abstractproperty
@@ -22,6 +24,7 @@ from google.cloud.exceptions import NotFound as GoogleCloudNotFound, Forbidden a
 
 from cvat.apps.engine.log import slogger
 from cvat.apps.engine.models import CredentialsTypeChoice, CloudProviderChoice
+from cvat.apps.engine.utils import parse_specific_attributes
 
 class Status(str, Enum):
     AVAILABLE = 'AVAILABLE'
@@ -128,6 +131,53 @@ def get_cloud_storage_instance(cloud_provider, resource, credentials, specific_a
         raise NotImplementedError()
     return instance
 
+def _create_cloud_storage_instance(db_storage_id, cloud_provider, resource,
+        credentials_type, credentials_value, specific_attributes, key_file_mtime):
+    # db_storage_id and key_file_mtime are a part of the cache key only
+    credentials = Credentials()
+    credentials.convert_from_db({
+        'type': credentials_type,
+        'value': credentials_value,
+    })
+    return get_cloud_storage_instance(cloud_provider=cloud_provider,
+        resource=resource, credentials=credentials,
+        specific_attributes=parse_specific_attributes(specific_attributes))
+
+class _CloudStorageInstances(threading.local):
+    # boto3 resources and the content of storage instances can't be shared
+    # between request threads, so every thread keeps its own instances
+    generation = None
+    get = None
+
+_cloud_storage_instances = _CloudStorageInstances()
+_cloud_storage_instances_generation = 0
+
+def get_cached_cloud_storage_instance(db_storage):
+    """Returns a storage instance for a cloud storage model. Clients of cloud
+    providers are expensive to create, so instances are reused by the
+    current thread until the storage settings are changed."""
+    key_file_mtime = None
+    if db_storage.credentials_type == CredentialsTypeChoice.KEY_FILE_PATH:
+        # the key file can be replaced keeping the same path
+        try:
+            key_file_mtime = os.stat(db_storage.credentials).st_mtime_ns
+        except OSError:
+            pass # the client reports a missing key file itself
+
+    instances = _cloud_storage_instances
+    if instances.generation != _cloud_storage_instances_generation:
+        instances.get = functools.lru_cache(maxsize=16)(_create_cloud_storage_instance)
+        instances.generation = _cloud_storage_instances_generation
+    return instances.get(db_storage.id,
+        db_storage.provider_type, db_storage.resource,
+        db_storage.credentials_type, db_storage.credentials,
+        db_storage.specific_attributes, key_file_mtime)
+
+def clear_cloud_storage_instances():
+    # instances of other threads are dropped on their next request
+    global _cloud_storage_instances_generation
+    _cloud_storage_instances_generation += 1
+
 class AWS_S3(_CloudStorage):
     transfer_config = {
         'max_io_queue': 10,
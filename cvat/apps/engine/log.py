@@ -2,8 +2,13 @@
 #
 # SPDX-License-Identifier: MIT
 
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 from cvat.settings.base import LOGGING
 from .models import Job, Task, Project, CloudStorage
 
@@ -118,6 +123,82 @@ class CloudSourceLoggerStorage:
 
         return logger
 
+class ClientFileHandlerDispatcher(logging.Handler):
+    """Writes records taken from the client log queue to the file handler
+    of the logger which has emitted them."""
+    def __init__(self):
+        super().__init__()
+        self._handlers = dict()
+
+    def register(self, logger_name, handler):
+        self._handlers[logger_name] = handler
+
+    def handle(self, record):
+        handler = self._handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+        return handler is not None
+
+    def emit(self, record):
+        pass
+
+class ClientLogQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records for the listener of the client log queue or, in
+    forked processes, writes them synchronously."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue.queue)
+        self._log_queue = log_queue
+
+    def handle(self, record):
+        if self._log_queue.synchronous:
+            return self._log_queue.dispatcher.handle(record)
+        return super().handle(record)
+
+class ClientLogQueue:
+    """Moves writing of client log files out of the request thread.
+
+    Client loggers get a QueueHandler which only enqueues records, files are
+    written by a QueueListener in a background thread. The listener is started
+    on the first use, so it is created in the process which really logs, and
+    it is stopped at exit after writing all queued records. Records which are
+    still queued when the process is killed (e.g. by SIGKILL or os._exit())
+    are lost.
+
+    Forked processes (e.g. RQ work-horses) don't have the listener thread and
+    exit with os._exit(), so they write records synchronously.
+    """
+    def __init__(self):
+        self.queue = queue.Queue(-1)
+        self.dispatcher = ClientFileHandlerDispatcher()
+        self.synchronous = False
+        self._queue_handler = ClientLogQueueHandler(self)
+        self._listener = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def _after_fork_in_child(self):
+        self.synchronous = True
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def add_file_handler(self, logger, file_handler):
+        if not self.synchronous:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = logging.handlers.QueueListener(
+                        self.queue, self.dispatcher)
+                    self._listener.start()
+                    atexit.register(self._listener.stop)
+        self.dispatcher.register(logger.name, file_handler)
+        logger.addHandler(self._queue_handler)
+
+    def flush(self):
+        """Waits until all queued records are written"""
+        if not self.synchronous:
+            self.queue.join()
+
+client_log_queue = ClientLogQueue()
+
 class ProjectClientLoggerStorage:
     def __init__(self):
         self._storage = dict()
@@ -132,7 +213,7 @@ class ProjectClientLoggerStorage:
         project = _get_project(pid)
         logger = logging.getLogger('cvat.client.project_{}'.format(pid))
         client_file = logging.FileHandler(filename=project.get_client_log_path())
-        logger.addHandler(client_file)
+        client_log_queue.add_file_handler(logger, client_file)
 
         return logger
 
@@ -149,7 +230,7 @@ class TaskClientLoggerStorage:
         task = _get_task(tid)
         logger = logging.getLogger('cvat.client.task_{}'.format(tid))
         client_file = logging.FileHandler(filename=task.get_client_log_path())
-        logger.addHandler(client_file)
+        client_log_queue.add_file_handler(logger, client_file)
 
         return logger
 
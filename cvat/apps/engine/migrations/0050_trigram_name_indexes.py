@@ -0,0 +1,81 @@
+import os
+
+from django.conf import settings
+from django.db import migrations
+
+from cvat.apps.engine.log import get_logger
+
+MIGRATION_NAME = os.path.splitext(os.path.basename(__file__))[0]
+MIGRATION_LOG = os.path.join(settings.MIGRATIONS_LOGS_ROOT, f"{MIGRATION_NAME}.log")
+
+# Filters use icontains lookups which PostgreSQL compiles into
+# UPPER("column"::text) LIKE UPPER('%value%'). Such expressions can be
+# served only by trigram indexes built on the same expression.
+TRIGRAM_INDEXES = (
+    ('engine_project_name_trgm_idx', 'engine_project', 'name'),
+    ('engine_task_name_trgm_idx', 'engine_task', 'name'),
+)
+
+def _is_extension_installed(cursor):
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    return cursor.fetchone() is not None
+
+def _can_create_extension(connection, cursor):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    if cursor.fetchone() is None:
+        return False
+
+    cursor.execute("SELECT rolsuper FROM pg_roles WHERE rolname = current_user")
+    if cursor.fetchone()[0]:
+        return True
+
+    # Since PostgreSQL 13 trusted extensions (pg_trgm is one of them) can be
+    # created by any user with the CREATE privilege on the database.
+    if connection.pg_version < 130000:
+        return False
+    cursor.execute("SELECT 1 FROM pg_available_extension_versions "
+        "WHERE name = 'pg_trgm' AND trusted "
+        "AND has_database_privilege(current_database(), 'CREATE')")
+    return cursor.fetchone() is not None
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if not _is_extension_installed(cursor):
+            if not _can_create_extension(schema_editor.connection, cursor):
+                logger = get_logger(MIGRATION_NAME, MIGRATION_LOG)
+                logger.warning('The pg_trgm extension is not installed and '
+                    'the current database user cannot create it. Trigram '
+                    'indexes for name filters are skipped. Run '
+                    '"CREATE EXTENSION pg_trgm" as a superuser and migrate '
+                    'the engine app back to 0049 and forward again to '
+                    'create them.')
+                return
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS "{}" ON "{}" USING gin '
+            '(UPPER("{}"::text) gin_trgm_ops)'.format(index_name, table_name, column_name))
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS "{}"'.format(index_name))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0049_auto_20220202_0710'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=create_trigram_indexes,
+            reverse_code=drop_trigram_indexes,
+        ),
+    ]
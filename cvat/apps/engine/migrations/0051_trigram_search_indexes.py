@@ -0,0 +1,61 @@
+import os
+
+from django.conf import settings
+from django.db import migrations
+
+from cvat.apps.engine.log import get_logger
+
+MIGRATION_NAME = os.path.splitext(os.path.basename(__file__))[0]
+MIGRATION_LOG = os.path.join(settings.MIGRATIONS_LOGS_ROOT, f"{MIGRATION_NAME}.log")
+
+# The same kind of indexes as in 0050_trigram_name_indexes for other
+# columns which are filtered with icontains lookups: usernames (owner and
+# assignee filters of jobs, tasks, projects and cloud storages) and
+# text fields of cloud storages. Columns with a fixed set of values
+# (e.g. provider_type) are short and don't benefit from such indexes.
+TRIGRAM_INDEXES = (
+    ('auth_user_username_trgm_idx', 'auth_user', 'username'),
+    ('engine_cloudstorage_display_name_trgm_idx', 'engine_cloudstorage', 'display_name'),
+    ('engine_cloudstorage_resource_trgm_idx', 'engine_cloudstorage', 'resource'),
+    ('engine_cloudstorage_description_trgm_idx', 'engine_cloudstorage', 'description'),
+)
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    # The pg_trgm extension is created by 0050_trigram_name_indexes when
+    # the database user is allowed to do that.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger = get_logger(MIGRATION_NAME, MIGRATION_LOG)
+            logger.warning('The pg_trgm extension is not installed. Trigram '
+                'indexes for username and cloud storage filters are skipped.')
+            return
+
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS "{}" ON "{}" USING gin '
+            '(UPPER("{}"::text) gin_trgm_ops)'.format(index_name, table_name, column_name))
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS "{}"'.format(index_name))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('engine', '0050_trigram_name_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=create_trigram_indexes,
+            reverse_code=drop_trigram_indexes,
+        ),
+    ]
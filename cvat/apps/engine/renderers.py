@@ -2,7 +2,42 @@
 #
 # SPDX-License-Identifier: MIT
 
+import orjson
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
 
 class CVATAPIRenderer(JSONRenderer):
-    media_type = 'application/vnd.cvat+json'
\ No newline at end of file
+    """Renders the same JSON as JSONRenderer using orjson where possible
+
+    Data which orjson can't encode, like integers beyond 64 bits, is
+    rendered by JSONRenderer. The only difference is NaN and Infinity:
+    orjson renders them as null, while JSONRenderer raises ValueError
+    in the strict mode.
+    """
+
+    media_type = 'application/vnd.cvat+json'
+
+    # Types which orjson doesn't support natively (lazy strings, decimals, etc.)
+    # and datetime objects are serialized in the same way as by DRF
+    _encoder = JSONEncoder()
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson supports only the fixed 2-space indentation
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._encoder.default,
+                option=self._orjson_options)
+        except orjson.JSONEncodeError:
+            # JSONRenderer renders the data or raises the same error
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # We always fully escape \u2028 and \u2029 to ensure we output JSON
+        # that is a strict javascript subset, as it is done by JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
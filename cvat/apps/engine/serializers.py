@@ -2,14 +2,23 @@
 #
 # SPDX-License-Identifier: MIT
 
+import functools
 import os
 import re
 import shutil
+import types
 
+from collections import OrderedDict
+from collections.abc import Mapping
+from operator import attrgetter
 from tempfile import NamedTemporaryFile
 
 from rest_framework import serializers, exceptions
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 from django.contrib.auth.models import User, Group
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.functional import cached_property
 
 from cvat.apps.dataset_manager.formats.utils import get_label_color
 from cvat.apps.engine import models
@@ -17,7 +26,61 @@ from cvat.apps.engine.cloud_provider import get_cloud_storage_instance, Credenti
 from cvat.apps.engine.log import slogger
 from cvat.apps.engine.utils import parse_specific_attributes
 
-class BasicUserSerializer(serializers.ModelSerializer):
+class FastAttributeAccessMixin:
+    """Speeds up serialization of many objects with plain attribute sources.
+
+    DRF resolves every field with Field.get_attribute(), which walks the
+    source path step by step and inspects each value for mappings and
+    callables. For fields with the default get_attribute() the mixin caches
+    an operator.attrgetter() and uses it directly. The generic path is used
+    when the getter fails or returns a callable, so defaults, missing
+    relations and methods are handled exactly as DRF does.
+    """
+
+    _CALLABLE_TYPES = (types.FunctionType, types.MethodType,
+        types.BuiltinFunctionType, functools.partial)
+
+    @cached_property
+    def _attribute_getters(self):
+        getters = {}
+        for field in self._readable_fields:
+            if type(field).get_attribute is serializers.Field.get_attribute \
+                    and field.source != '*':
+                getters[field.field_name] = attrgetter(field.source)
+        return getters
+
+    def _get_field_attribute(self, field, instance):
+        getter = self._attribute_getters.get(field.field_name)
+        if getter is not None:
+            try:
+                attribute = getter(instance)
+            except (AttributeError, ObjectDoesNotExist):
+                pass
+            else:
+                if not isinstance(attribute, self._CALLABLE_TYPES):
+                    return attribute
+        return field.get_attribute(instance)
+
+    def to_representation(self, instance):
+        if isinstance(instance, Mapping):
+            return super().to_representation(instance)
+
+        ret = OrderedDict()
+        for field in self._readable_fields:
+            try:
+                attribute = self._get_field_attribute(field, instance)
+            except SkipField:
+                continue
+
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field.field_name] = None
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+
+        return ret
+
+class BasicUserSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     def validate(self, data):
         if hasattr(self, 'initial_data'):
             unknown_keys = set(self.initial_data.keys()) - set(self.fields.keys())
@@ -67,7 +130,7 @@ class AttributeSerializer(serializers.ModelSerializer):
 
         return attribute
 
-class LabelSerializer(serializers.ModelSerializer):
+class LabelSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
     attributes = AttributeSerializer(many=True, source='attributespec_set',
         default=[])
@@ -138,7 +201,7 @@ class JobCommitSerializer(serializers.ModelSerializer):
         model = models.JobCommit
         fields = ('id', 'version', 'owner', 'message', 'timestamp')
 
-class JobReadSerializer(serializers.ModelSerializer):
+class JobReadSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     task_id = serializers.ReadOnlyField(source="segment.task.id")
     project_id = serializers.ReadOnlyField(source="get_project_id", allow_null=True)
     start_frame = serializers.ReadOnlyField(source="segment.start_frame")
@@ -190,7 +253,7 @@ class JobWriteSerializer(serializers.ModelSerializer):
         model = models.Job
         fields = ('assignee', 'stage', 'state')
 
-class SimpleJobSerializer(serializers.ModelSerializer):
+class SimpleJobSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     assignee = BasicUserSerializer(allow_null=True)
 
     class Meta:
@@ -198,7 +261,7 @@ class SimpleJobSerializer(serializers.ModelSerializer):
         fields = ('url', 'id', 'assignee', 'status', 'stage', 'state')
         read_only_fields = fields
 
-class SegmentSerializer(serializers.ModelSerializer):
+class SegmentSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     jobs = SimpleJobSerializer(many=True, source='job_set')
 
     class Meta:
@@ -387,7 +450,7 @@ class DataSerializer(serializers.ModelSerializer):
                 remote_file = models.RemoteFile(data=instance, **f)
                 remote_file.save()
 
-class TaskSerializer(WriteOnceMixin, serializers.ModelSerializer):
+class TaskSerializer(WriteOnceMixin, FastAttributeAccessMixin, serializers.ModelSerializer):
     labels = LabelSerializer(many=True, source='label_set', partial=True, required=False)
     segments = SegmentSerializer(many=True, source='segment_set', read_only=True)
     data_chunk_size = serializers.ReadOnlyField(source='data.chunk_size')
@@ -553,7 +616,7 @@ class TaskSerializer(WriteOnceMixin, serializers.ModelSerializer):
         return attrs
 
 
-class ProjectSearchSerializer(serializers.ModelSerializer):
+class ProjectSearchSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Project
         fields = ('id', 'name')
@@ -567,7 +630,7 @@ class TrainingProjectSerializer(serializers.ModelSerializer):
         write_once_fields = ('host', 'username', 'password', 'project_class')
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     labels = LabelSerializer(many=True, source='label_set', partial=True, default=[])
     owner = BasicUserSerializer(required=False, read_only=True)
     owner_id = serializers.IntegerField(write_only=True, allow_null=True, required=False)
@@ -588,10 +651,16 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         response = super().to_representation(instance)
-        task_subsets = set(instance.tasks.values_list('subset', flat=True))
+        # use the same list of tasks for all the fields, prefetched tasks
+        # are already ordered by id
+        if 'tasks' in getattr(instance, '_prefetched_objects_cache', {}):
+            db_tasks = list(instance.tasks.all())
+        else:
+            db_tasks = list(instance.tasks.order_by('id'))
+        task_subsets = set(db_task.subset for db_task in db_tasks)
         task_subsets.discard('')
         response['task_subsets'] = list(task_subsets)
-        response['dimension'] = instance.tasks.first().dimension if instance.tasks.count() else None
+        response['dimension'] = db_tasks[0].dimension if db_tasks else None
         return response
 
     # pylint: disable=no-self-use
@@ -795,7 +864,7 @@ class TaskFileSerializer(serializers.Serializer):
 class ProjectFileSerializer(serializers.Serializer):
     project_file = serializers.FileField()
 
-class CommentReadSerializer(serializers.ModelSerializer):
+class CommentReadSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     owner = BasicUserSerializer(allow_null=True, required=False)
 
     class Meta:
@@ -817,7 +886,7 @@ class CommentWriteSerializer(WriteOnceMixin, serializers.ModelSerializer):
         write_once_fields = ('issue', )
 
 
-class IssueReadSerializer(serializers.ModelSerializer):
+class IssueReadSerializer(FastAttributeAccessMixin, serializers.ModelSerializer):
     owner = BasicUserSerializer(allow_null=True, required=False)
     assignee = BasicUserSerializer(allow_null=True, required=False)
     position = serializers.ListField(
@@ -1,13 +1,20 @@
 # Copyright (C) 2019 Intel Corporation
 #
 # SPDX-License-Identifier: MIT
+import functools
+import os
 import shutil
+import uuid
 
+import django_rq
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+from .cloud_provider import clear_cloud_storage_instances
 from .models import (
+    CloudStorage,
     Data,
     Job,
     StatusChoice,
@@ -37,11 +44,45 @@ def create_profile(instance, **kwargs):
         profile.user = instance
         profile.save()
 
+def _remove_dir_in_background(dirname):
+    """Renames a directory to a unique name next to it and removes it in
+    an RQ job.
+
+    Renaming is a single metadata operation, unlike removing of a tree
+    with thousands of files. If the directory can't be renamed or the job
+    can't be enqueued, it is removed synchronously.
+    """
+    if not os.path.isdir(dirname):
+        return
+
+    trash_dirname = '{}.deleted-{}'.format(dirname.rstrip(os.sep), uuid.uuid4().hex)
+    try:
+        os.rename(dirname, trash_dirname)
+    except OSError:
+        shutil.rmtree(dirname, ignore_errors=True)
+        return
+
+    try:
+        queue = django_rq.get_queue("low")
+        queue.enqueue_call(func=shutil.rmtree, args=(trash_dirname, ),
+            kwargs={'ignore_errors': True})
+    except Exception:
+        shutil.rmtree(trash_dirname, ignore_errors=True)
+
+# Directories are touched only when the deletion is committed: if it is
+# rolled back, the objects stay in the database together with their files.
 @receiver(post_delete, sender=Task, dispatch_uid="delete_task_files_on_delete_task")
 def delete_task_files_on_delete_task(instance, **kwargs):
-    shutil.rmtree(instance.get_task_dirname(), ignore_errors=True)
+    transaction.on_commit(functools.partial(
+        _remove_dir_in_background, instance.get_task_dirname()))
 
 
 @receiver(post_delete, sender=Data, dispatch_uid="delete_data_files_on_delete_data")
 def delete_data_files_on_delete_data(instance, **kwargs):
-    shutil.rmtree(instance.get_data_dirname(), ignore_errors=True)
+    transaction.on_commit(functools.partial(
+        _remove_dir_in_background, instance.get_data_dirname()))
+
+@receiver(post_save, sender=CloudStorage, dispatch_uid="clear_cloud_storage_instances_on_save")
+@receiver(post_delete, sender=CloudStorage, dispatch_uid="clear_cloud_storage_instances_on_delete")
+def clear_cloud_storage_instances_on_change(**kwargs):
+    clear_cloud_storage_instances()
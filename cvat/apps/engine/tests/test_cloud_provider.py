@@ -0,0 +1,96 @@
+# Copyright (C) 2022 Intel Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from cvat.apps.engine.cloud_provider import (clear_cloud_storage_instances,
+    get_cached_cloud_storage_instance)
+from cvat.apps.engine.models import (CloudProviderChoice, CloudStorage,
+    CredentialsTypeChoice)
+
+
+class CachedCloudStorageInstanceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner')
+
+    def setUp(self):
+        self.db_storage = CloudStorage.objects.create(
+            provider_type=CloudProviderChoice.AWS_S3,
+            resource='bucket',
+            display_name='bucket',
+            owner=self.owner,
+            credentials='key secret_key',
+            credentials_type=CredentialsTypeChoice.KEY_SECRET_KEY_PAIR,
+            specific_attributes='region=eu-west-1',
+        )
+        clear_cloud_storage_instances()
+
+        patcher = mock.patch('cvat.apps.engine.cloud_provider.get_cloud_storage_instance',
+            side_effect=lambda **kwargs: mock.Mock(**kwargs))
+        self.get_cloud_storage_instance = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_instance_is_reused(self):
+        storage = get_cached_cloud_storage_instance(self.db_storage)
+        self.assertIs(get_cached_cloud_storage_instance(self.db_storage), storage)
+        self.assertEqual(self.get_cloud_storage_instance.call_count, 1)
+
+        kwargs = self.get_cloud_storage_instance.call_args.kwargs
+        self.assertEqual(kwargs['cloud_provider'], CloudProviderChoice.AWS_S3)
+        self.assertEqual(kwargs['resource'], 'bucket')
+        self.assertEqual(kwargs['credentials'].key, 'key')
+        self.assertEqual(kwargs['credentials'].secret_key, 'secret_key')
+        self.assertEqual(kwargs['specific_attributes'], {'region': 'eu-west-1'})
+
+    def test_instance_is_recreated_after_update(self):
+        storage = get_cached_cloud_storage_instance(self.db_storage)
+
+        self.db_storage.credentials = 'new_key new_secret_key'
+        self.db_storage.save()
+
+        updated_storage = get_cached_cloud_storage_instance(self.db_storage)
+        self.assertIsNot(updated_storage, storage)
+        self.assertEqual(self.get_cloud_storage_instance.call_args.kwargs['credentials'].key,
+            'new_key')
+
+    def test_instances_are_cleared_on_save(self):
+        storage = get_cached_cloud_storage_instance(self.db_storage)
+
+        self.db_storage.display_name = 'new name'
+        self.db_storage.save()
+
+        self.assertIsNot(get_cached_cloud_storage_instance(self.db_storage), storage)
+        self.assertEqual(self.get_cloud_storage_instance.call_count, 2)
+
+    def test_instances_are_not_shared_between_threads(self):
+        storage = get_cached_cloud_storage_instance(self.db_storage)
+
+        thread_storages = []
+        thread = threading.Thread(target=lambda: thread_storages.append(
+            get_cached_cloud_storage_instance(self.db_storage)))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(len(thread_storages), 1)
+        self.assertIsNot(thread_storages[0], storage)
+
+    def test_missing_key_file_is_reported_by_the_client(self):
+        self.db_storage.provider_type = CloudProviderChoice.GOOGLE_CLOUD_STORAGE
+        self.db_storage.credentials_type = CredentialsTypeChoice.KEY_FILE_PATH
+        self.db_storage.credentials = '/nonexistent/key.json'
+        self.db_storage.specific_attributes = ''
+        self.db_storage.save()
+
+        self.get_cloud_storage_instance.side_effect = FileNotFoundError()
+        with self.assertRaises(FileNotFoundError):
+            get_cached_cloud_storage_instance(self.db_storage)
+        # errors are not cached
+        self.get_cloud_storage_instance.side_effect = lambda **kwargs: mock.Mock(**kwargs)
+        get_cached_cloud_storage_instance(self.db_storage)
+        self.assertEqual(self.get_cloud_storage_instance.call_count, 2)
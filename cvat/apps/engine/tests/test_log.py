@@ -0,0 +1,91 @@
+# Copyright (C) 2022 Intel Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import os
+import os.path as osp
+import shutil
+import unittest
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from datumaro.util.test_utils import TestDir
+from cvat.apps.engine.log import ClientLogQueue, client_log_queue, clogger
+from cvat.apps.engine.models import Task
+
+
+def _read_file(path):
+    with open(path) as f:
+        return f.read()
+
+class ClientLogQueueTestCase(SimpleTestCase):
+    def _create_logger(self, log_queue, log_path):
+        logger = logging.getLogger('cvat.client.test_{}'.format(uuid.uuid4().hex))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        file_handler = logging.FileHandler(filename=log_path)
+        self.addCleanup(file_handler.close)
+        log_queue.add_file_handler(logger, file_handler)
+        return logger
+
+    def test_records_are_written_by_listener(self):
+        log_queue = ClientLogQueue()
+        with TestDir() as test_dir:
+            log_path = osp.join(test_dir, 'client.log')
+            logger = self._create_logger(log_queue, log_path)
+
+            logger.info('first message')
+            logger.error('second message')
+            log_queue.flush()
+
+            self.assertEqual(_read_file(log_path), 'first message\nsecond message\n')
+
+    def test_records_are_written_synchronously_after_fork(self):
+        log_queue = ClientLogQueue()
+        with TestDir() as test_dir:
+            log_path = osp.join(test_dir, 'client.log')
+            logger = self._create_logger(log_queue, log_path)
+
+            log_queue._after_fork_in_child()
+            logger.info('message')
+
+            self.assertTrue(log_queue.queue.empty())
+            self.assertEqual(_read_file(log_path), 'message\n')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork()')
+    def test_forked_process_writes_records_before_os_exit(self):
+        log_queue = ClientLogQueue()
+        with TestDir() as test_dir:
+            log_path = osp.join(test_dir, 'client.log')
+            logger = self._create_logger(log_queue, log_path)
+            logger.info('parent message')
+            log_queue.flush()
+
+            pid = os.fork()
+            if pid == 0:
+                exit_code = 1
+                try:
+                    logger.info('child message')
+                    exit_code = 0
+                finally:
+                    os._exit(exit_code) # like RQ work-horses
+            _, exit_status = os.waitpid(pid, 0)
+
+            self.assertEqual(exit_status, 0)
+            self.assertEqual(_read_file(log_path), 'parent message\nchild message\n')
+
+class TaskClientLoggerTestCase(TestCase):
+    def test_records_reach_task_client_log(self):
+        owner = User.objects.create_user(username='owner')
+        db_task = Task.objects.create(name='task for client logs', owner=owner)
+        shutil.rmtree(db_task.get_task_dirname(), ignore_errors=True)
+        os.makedirs(db_task.get_task_logs_dirname())
+        self.addCleanup(shutil.rmtree, db_task.get_task_dirname(), ignore_errors=True)
+
+        clogger.task[db_task.id].info('client message')
+        client_log_queue.flush()
+
+        self.assertIn('client message', _read_file(db_task.get_client_log_path()))
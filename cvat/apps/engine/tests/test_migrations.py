@@ -0,0 +1,105 @@
+# Copyright (C) 2022 Intel Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+name_indexes_migration = import_module(
+    'cvat.apps.engine.migrations.0050_trigram_name_indexes')
+search_indexes_migration = import_module(
+    'cvat.apps.engine.migrations.0051_trigram_search_indexes')
+
+
+def _create_schema_editor(query_results, pg_version=110000):
+    """Returns a fake PostgreSQL schema editor. query_results are the
+    values of cursor.fetchone() for the queries in the order they are run."""
+    cursor = mock.MagicMock()
+    cursor.fetchone.side_effect = list(query_results)
+    schema_editor = mock.MagicMock()
+    schema_editor.connection.vendor = 'postgresql'
+    schema_editor.connection.pg_version = pg_version
+    schema_editor.connection.cursor.return_value.__enter__.return_value = cursor
+    return schema_editor
+
+def _get_executed_sql(schema_editor):
+    return [c.args[0] for c in schema_editor.execute.call_args_list]
+
+
+class TrigramIndexesSQLiteMigrationTestCase(TransactionTestCase):
+    # SQLite schema editor can't be used inside the transaction of TestCase
+    def test_noop_on_sqlite(self):
+        self.assertEqual(connection.vendor, 'sqlite')
+        for migration in (name_indexes_migration, search_indexes_migration):
+            with self.subTest(migration=migration.MIGRATION_NAME):
+                with connection.schema_editor() as schema_editor, \
+                        CaptureQueriesContext(connection) as ctx:
+                    migration.create_trigram_indexes(apps, schema_editor)
+                    migration.drop_trigram_indexes(apps, schema_editor)
+                self.assertEqual(len(ctx.captured_queries), 0)
+
+
+class TrigramIndexesMigrationTestCase(SimpleTestCase):
+    def test_name_indexes_use_installed_extension(self):
+        schema_editor = _create_schema_editor([(1, )])
+        name_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        sql = _get_executed_sql(schema_editor)
+        self.assertFalse(any('CREATE EXTENSION' in s for s in sql))
+        self.assertEqual(len(sql), len(name_indexes_migration.TRIGRAM_INDEXES))
+
+    def test_name_indexes_create_extension_as_superuser(self):
+        # not installed, available, superuser
+        schema_editor = _create_schema_editor([None, (1, ), (True, )])
+        name_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        sql = _get_executed_sql(schema_editor)
+        self.assertEqual(sql[0], 'CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        self.assertEqual(len(sql), 1 + len(name_indexes_migration.TRIGRAM_INDEXES))
+
+    def test_name_indexes_create_trusted_extension(self):
+        # not installed, available, not a superuser, trusted with CREATE rights
+        schema_editor = _create_schema_editor([None, (1, ), (False, ), (1, )],
+            pg_version=130000)
+        name_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        sql = _get_executed_sql(schema_editor)
+        self.assertEqual(sql[0], 'CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    def test_name_indexes_skipped_without_rights(self):
+        # not installed, available, not a superuser on PostgreSQL 11
+        schema_editor = _create_schema_editor([None, (1, ), (False, )])
+        with mock.patch.object(name_indexes_migration, 'get_logger') as get_logger:
+            name_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        schema_editor.execute.assert_not_called()
+        get_logger.return_value.warning.assert_called_once()
+
+    def test_name_indexes_skipped_when_extension_is_unavailable(self):
+        schema_editor = _create_schema_editor([None, None])
+        with mock.patch.object(name_indexes_migration, 'get_logger') as get_logger:
+            name_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        schema_editor.execute.assert_not_called()
+        get_logger.return_value.warning.assert_called_once()
+
+    def test_search_indexes_use_installed_extension(self):
+        schema_editor = _create_schema_editor([(1, )])
+        search_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        sql = _get_executed_sql(schema_editor)
+        self.assertFalse(any('CREATE EXTENSION' in s for s in sql))
+        self.assertEqual(len(sql), len(search_indexes_migration.TRIGRAM_INDEXES))
+
+    def test_search_indexes_skipped_without_extension(self):
+        schema_editor = _create_schema_editor([None])
+        with mock.patch.object(search_indexes_migration, 'get_logger') as get_logger:
+            search_indexes_migration.create_trigram_indexes(apps, schema_editor)
+
+        schema_editor.execute.assert_not_called()
+        get_logger.return_value.warning.assert_called_once()
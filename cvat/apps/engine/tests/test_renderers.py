@@ -0,0 +1,73 @@
+# Copyright (C) 2022 Intel Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from cvat.apps.engine.renderers import CVATAPIRenderer
+
+
+class CVATAPIRendererTestCase(SimpleTestCase):
+    def _check_same_output(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        actual = CVATAPIRenderer().render(data, accepted_media_type)
+        self.assertEqual(actual, expected)
+
+    def test_datetimes(self):
+        self._check_same_output({
+            'aware': datetime(2022, 2, 3, 10, 20, 30, 123456, tzinfo=timezone.utc),
+            'aware_with_offset': datetime(2022, 2, 3, 10, 20, 30,
+                tzinfo=timezone(timedelta(hours=3))),
+            'naive': datetime(2022, 2, 3, 10, 20, 30, 5000),
+            'date': date(2022, 2, 3),
+            'time': time(10, 20, 30, 123456),
+            'timedelta': timedelta(days=1, seconds=5),
+        })
+
+    def test_non_str_keys(self):
+        self._check_same_output({1: 'int', 2.5: 'float', None: 'none'})
+        self._check_same_output({False: 'bool'})
+
+    def test_decimals_and_uuids(self):
+        self._check_same_output({
+            'decimal': Decimal('1.10'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        })
+
+    def test_lazy_strings(self):
+        self._check_same_output({'name': gettext_lazy('Annotation'),
+            'values': [gettext_lazy('Validation')]})
+
+    def test_unicode_line_separators(self):
+        self._check_same_output({'name': 'a\u2028b\u2029c', 'text': 'тест'})
+
+    def test_indent_fallback(self):
+        self._check_same_output({'list': [1, 2, {'a': None}]},
+            'application/json; indent=4')
+
+    def test_big_integers_are_rendered_by_json_renderer(self):
+        self._check_same_output({'value': 2 ** 64, 'negative': -2 ** 63 - 1})
+
+    def test_unsupported_types_raise_type_error(self):
+        with self.assertRaises(TypeError):
+            JSONRenderer().render({'value': object()})
+        with self.assertRaises(TypeError):
+            CVATAPIRenderer().render({'value': object()})
+
+    def test_nan_and_infinity_are_rendered_as_null(self):
+        # JSONRenderer refuses to render them in the strict mode
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'value': float('nan')})
+
+        self.assertEqual(CVATAPIRenderer().render(
+            {'nan': float('nan'), 'inf': float('inf'), 'neg_inf': float('-inf')}),
+            b'{"nan":null,"inf":null,"neg_inf":null}')
+
+    def test_none(self):
+        self.assertEqual(CVATAPIRenderer().render(None), b'')
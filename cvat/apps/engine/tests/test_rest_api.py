@@ -27,6 +27,7 @@ from django.http import HttpResponse
 from PIL import Image
 from pycocotools import coco as coco_loader
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APIClient, APITestCase
 
 from datumaro.util.test_utils import TestDir
@@ -34,6 +35,7 @@ from cvat.apps.engine.models import (AttributeSpec, AttributeType, Data, Job,
     Project, Segment, StageChoice, StatusChoice, Task, Label, StorageMethodChoice,
     StorageChoice, DimensionType, SortingMethod)
 from cvat.apps.engine.media_extractors import ValidateDimension, sort
+from cvat.apps.engine.views import _remove_rq_job_tmp_file
 from utils.dataset_manifest import ImageManifestManager, VideoManifestManager
 
 #supress av warnings
@@ -1939,7 +1941,9 @@ class TaskDeleteAPITestCase(APITestCase):
         for task in self.tasks:
             task_dir = task.get_task_dirname()
             self.assertTrue(os.path.exists(task_dir))
-        self._check_api_v2_tasks_id(self.admin)
+        # directories are removed when the deletion is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self._check_api_v2_tasks_id(self.admin)
         for task in self.tasks:
             task_dir = task.get_task_dirname()
             self.assertFalse(os.path.exists(task_dir))
@@ -2364,6 +2368,32 @@ class TaskMoveAPITestCase(APITestCase):
         }
         self._check_api_v2_tasks(self.task.id, data)
 
+    def test_move_task_updates_projects(self):
+        self._check_api_v2_tasks(self.task.id, {
+            "project_id": self.projects[0].id
+        })
+
+        src_project, dst_project = self.projects
+        src_project.refresh_from_db()
+        dst_project.refresh_from_db()
+        src_updated_date = src_project.updated_date
+        dst_updated_date = dst_project.updated_date
+
+        # Both the previous and the new project of the task must be updated
+        data = {
+            "project_id": dst_project.id,
+            "labels": [{
+                "id": src_project.label_set.all()[1].id,
+                "name": "test"
+            }]
+        }
+        self._check_api_v2_tasks(self.task.id, data)
+
+        src_project.refresh_from_db()
+        dst_project.refresh_from_db()
+        self.assertGreater(src_project.updated_date, src_updated_date)
+        self.assertGreater(dst_project.updated_date, dst_updated_date)
+
 class TaskCreateAPITestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -3861,6 +3891,56 @@ class TaskDataAPITestCase(APITestCase):
         response = self._create_task(None, data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_api_v2_tasks_id_data_cached_chunk_etag(self):
+        task_spec = {
+            "name": "my cached task for chunk revalidation",
+            "overlap": 0,
+            "segment_size": 0,
+            "labels": [
+                {"name": "car"},
+                {"name": "person"},
+            ]
+        }
+
+        task_data = {
+            "server_files[0]": "test_archive_1.zip",
+            "image_quality": 70,
+            "use_cache": True
+        }
+        image_sizes = self._image_sizes[task_data["server_files[0]"]]
+
+        response = self._create_task(self.admin, task_spec)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task_id = response.data["id"]
+
+        response = self._run_api_v2_tasks_id_data_post(task_id, self.admin, task_data)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        task = self._get_task(self.admin, task_id).json()
+
+        # a normal request returns the chunk with an ETag
+        response = self._get_compressed_chunk(task_id, self.admin, 0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header("ETag"))
+        etag = response["ETag"]
+        chunk = b"".join(response.streaming_content)
+        images = self._extract_zip_chunk(io.BytesIO(chunk))
+        self.assertEqual(len(images), min(task["data_chunk_size"], len(image_sizes)))
+        for image_idx, image in enumerate(images):
+            self.assertEqual(image.size, image_sizes[image_idx])
+
+        # a conditional request with the same ETag doesn't return the chunk
+        with ForceLogin(self.admin, self.client):
+            response = self.client.get(
+                '/api/tasks/{}/data?type=chunk&quality=compressed&number=0'.format(task_id),
+                HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        response = self._get_compressed_chunk(task_id, self.admin, 0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(b"".join(response.streaming_content), chunk)
+
 def compare_objects(self, obj1, obj2, ignore_keys, fp_tolerance=.001,
         current_key=None):
     key_info = "{}: ".format(current_key) if current_key else ""
@@ -5750,6 +5830,66 @@ class TaskAnnotationAPITestCase(JobAnnotationAPITestCase):
     def test_api_v2_tasks_id_annotations_upload_coco_user(self):
         self._run_coco_annotation_upload_test(self.user)
 
+    def _record_tmp_files(self):
+        tmp_files = []
+        def record_mkstemp(*args, **kwargs):
+            fd, filename = tempfile.mkstemp(*args, **kwargs)
+            tmp_files.append(filename)
+            return fd, filename
+        return tmp_files, mock.patch("cvat.apps.engine.views.mkstemp",
+            side_effect=record_mkstemp)
+
+    def test_api_v2_tasks_id_annotations_upload_removes_tmp_file(self):
+        tmp_files, mkstemp_patch = self._record_tmp_files()
+        with mkstemp_patch:
+            self._run_coco_annotation_upload_test(self.user)
+
+        self.assertEqual(len(tmp_files), 1)
+        self.assertFalse(os.path.exists(tmp_files[0]))
+
+    def test_api_v2_tasks_id_annotations_failed_upload_removes_tmp_file(self):
+        task, _ = self._create_task(self.user, self.user)
+        uploaded_data = {
+            "annotation_file": io.BytesIO(b"not an annotation file"),
+        }
+
+        tmp_files, mkstemp_patch = self._record_tmp_files()
+        with mkstemp_patch:
+            # RQ runs jobs synchronously in tests and re-raises their errors
+            with self.assertRaises(Exception):
+                self._upload_api_v2_tasks_id_annotations(task["id"], self.user,
+                    uploaded_data, "format=COCO 1.0")
+
+        self.assertEqual(len(tmp_files), 1)
+        self.assertFalse(os.path.exists(tmp_files[0]))
+
+    def test_api_v2_tasks_id_annotations_rejected_upload_removes_tmp_file(self):
+        task, _ = self._create_task(self.user, self.user)
+        uploaded_data = {
+            "annotation_file": io.BytesIO(b"{}"),
+        }
+
+        tmp_files, mkstemp_patch = self._record_tmp_files()
+        with mkstemp_patch, mock.patch("cvat.apps.engine.views.av_scan_paths",
+                side_effect=ValidationError("infected")):
+            response = self._upload_api_v2_tasks_id_annotations(task["id"],
+                self.user, uploaded_data, "format=COCO 1.0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(len(tmp_files), 1)
+        self.assertFalse(os.path.exists(tmp_files[0]))
+
+    def test_api_v2_tasks_id_annotations_killed_import_tmp_file_is_removed(self):
+        # a killed work-horse doesn't remove the file, the status request does
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        rq_job = mock.Mock(meta={"tmp_file": filename})
+
+        _remove_rq_job_tmp_file(rq_job)
+        self.assertFalse(os.path.exists(filename))
+        # the file can be already removed by the worker
+        _remove_rq_job_tmp_file(rq_job)
+
 class ServerShareAPITestCase(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -5845,6 +5985,16 @@ class ServerShareAPITestCase(APITestCase):
         response = self._run_api_v2_server_share(user, "/test4")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_api_v2_server_share_sibling_directory(self):
+        sibling = settings.SHARE_ROOT.rstrip(os.sep) + "_sibling"
+        os.makedirs(sibling)
+        try:
+            response = self._run_api_v2_server_share(self.admin,
+                "/../{}".format(os.path.basename(sibling)))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        finally:
+            shutil.rmtree(sibling)
+
     def test_api_v2_server_share_admin(self):
         self._test_api_v2_server_share(self.admin)
 
@@ -0,0 +1,91 @@
+# Copyright (C) 2022 Intel Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework import serializers
+
+from cvat.apps.engine.models import Data, Project, Task, Video
+from cvat.apps.engine.serializers import FastAttributeAccessMixin
+
+
+class _TaskSummaryField(serializers.Field):
+    def to_representation(self, task):
+        return '{} #{}'.format(task.name, task.id)
+
+def _get_task_fields():
+    return {
+        'id': serializers.IntegerField(read_only=True),
+        'name': serializers.CharField(),
+        'owner_username': serializers.ReadOnlyField(source='owner.username'),
+        'assignee_username': serializers.CharField(source='assignee.username',
+            allow_null=True, read_only=True),
+        'assignee': serializers.PrimaryKeyRelatedField(allow_null=True, read_only=True),
+        'project_name': serializers.ReadOnlyField(source='project.name'),
+        'frame_step': serializers.ReadOnlyField(source='data.get_frame_step'),
+        'video_width': serializers.IntegerField(source='data.video.width',
+            read_only=True),
+        'task_dirname': serializers.ReadOnlyField(source='get_task_dirname'),
+        'summary': _TaskSummaryField(source='*', read_only=True),
+    }
+
+def _create_serializer_classes(**extra_fields):
+    """Returns the same serializer with and without FastAttributeAccessMixin.
+    Both classes have the same name to get the same error messages."""
+    return tuple(
+        type('TaskTestSerializer', bases, {**_get_task_fields(), **extra_fields})
+        for bases in [
+            (serializers.Serializer, ),
+            (FastAttributeAccessMixin, serializers.Serializer),
+        ]
+    )
+
+class FastAttributeAccessMixinTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username='owner')
+        assignee = User.objects.create_user(username='assignee')
+        project = Project.objects.create(name='project', owner=owner)
+
+        video_data = Data.objects.create(frame_filter='step=5')
+        Video.objects.create(data=video_data, width=640, height=480)
+
+        Task.objects.create(name='task', owner=owner, assignee=assignee,
+            project=project, data=video_data)
+        # null foreign keys and a missing reverse one-to-one relation
+        Task.objects.create(name='task without relations', data=Data.objects.create())
+        Task.objects.create(name='task without data', owner=owner)
+
+    def _check_same_output(self, stock_serializer_class, fast_serializer_class):
+        tasks = list(Task.objects.order_by('id'))
+        for task in tasks:
+            with self.subTest(task=task.name):
+                self.assertEqual(fast_serializer_class(task).data,
+                    stock_serializer_class(task).data)
+        self.assertEqual(fast_serializer_class(tasks, many=True).data,
+            stock_serializer_class(tasks, many=True).data)
+
+    def test_same_output_as_stock_serializer(self):
+        stock_serializer_class, fast_serializer_class = _create_serializer_classes()
+        self._check_same_output(stock_serializer_class, fast_serializer_class)
+
+        task = Task.objects.get(name='task without relations')
+        representation = fast_serializer_class(task).data
+        self.assertIsNone(representation['assignee_username'])
+        self.assertIsNone(representation['assignee'])
+        self.assertIsNone(representation['video_width'])
+        self.assertNotIn('owner_username', representation)
+        self.assertEqual(representation['summary'],
+            'task without relations #{}'.format(task.id))
+
+    def test_same_error_for_missing_attribute(self):
+        stock_serializer_class, fast_serializer_class = _create_serializer_classes(
+            missing=serializers.CharField(source='owner.missing'))
+        task = Task.objects.get(name='task')
+
+        with self.assertRaises(AttributeError) as stock_error:
+            stock_serializer_class(task).data
+        with self.assertRaises(AttributeError) as fast_error:
+            fast_serializer_class(task).data
+        self.assertEqual(str(fast_error.exception), str(stock_error.exception))
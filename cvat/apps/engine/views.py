@@ -3,25 +3,31 @@
 # SPDX-License-Identifier: MIT
 
 import errno
-import io
+import functools
 import os
 import os.path as osp
-import pytz
 import shutil
 import traceback
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from distutils.util import strtobool
 from tempfile import mkstemp, NamedTemporaryFile
 
 import cv2
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db.models import Exists, F, Max, OuterRef
 from django.db.models.query import Prefetch
 import django_rq
+import orjson
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import IntegrityError
-from django.http import HttpResponse, HttpResponseNotFound, HttpResponseBadRequest
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotFound, HttpResponseBadRequest
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.utils.decorators import method_decorator
 from django_filters import rest_framework as filters
 from django_filters.rest_framework import DjangoFilterBackend
@@ -32,14 +38,14 @@ from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import APIException, NotFound, ValidationError
 from rest_framework.permissions import SAFE_METHODS
-from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from django_sendfile import sendfile
+from rq.job import Job as RQJob, JobStatus
 
 import cvat.apps.dataset_manager as dm
 import cvat.apps.dataset_manager.views  # pylint: disable=unused-import
-from cvat.apps.engine.cloud_provider import get_cloud_storage_instance, Credentials, Status
+from cvat.apps.engine.cloud_provider import get_cached_cloud_storage_instance, Status
 from cvat.apps.dataset_manager.bindings import CvatImportError
 from cvat.apps.dataset_manager.serializers import DatasetFormatsSerializer
 from cvat.apps.engine.frame_provider import FrameProvider
@@ -47,7 +53,7 @@ from cvat.apps.engine.media_extractors import ImageListReader
 from cvat.apps.engine.mime_types import mimetypes
 from cvat.apps.engine.models import (
     Job, StatusChoice, Task, Project, Issue, Data,
-    Comment, StorageMethodChoice, StorageChoice, Image,
+    Comment, StorageMethodChoice, StorageChoice, RelatedFile,
     CredentialsTypeChoice, CloudProviderChoice
 )
 from cvat.apps.engine.models import CloudStorage as CloudStorageModel
@@ -97,9 +103,7 @@ class ServerViewSet(viewsets.ViewSet):
                 "and UX decisions are based on feedbacks from professional data " +
                 "annotation team."
         }
-        serializer = AboutSerializer(data=about)
-        if serializer.is_valid(raise_exception=True):
-            return Response(data=serializer.data)
+        return Response(data=about)
 
     @staticmethod
     @swagger_auto_schema(method='post', request_body=ExceptionSerializer)
@@ -115,7 +119,7 @@ class ServerViewSet(viewsets.ViewSet):
                 "username": request.user.username,
                 "name": "Send exception",
             }
-            message = JSONRenderer().render({**serializer.data, **additional_info}).decode('UTF-8')
+            message = orjson.dumps({**serializer.data, **additional_info}).decode('UTF-8')
             jid = serializer.data.get("job_id")
             tid = serializer.data.get("task_id")
             if jid:
@@ -139,7 +143,7 @@ class ServerViewSet(viewsets.ViewSet):
         if serializer.is_valid(raise_exception=True):
             user = { "username": request.user.username }
             for event in serializer.data:
-                message = JSONRenderer().render({**event, **user}).decode('UTF-8')
+                message = orjson.dumps({**event, **user}).decode('UTF-8')
                 jid = event.get("job_id")
                 tid = event.get("task_id")
                 if jid:
@@ -161,24 +165,22 @@ class ServerViewSet(viewsets.ViewSet):
         param = request.query_params.get('directory', '/')
         if param.startswith("/"):
             param = param[1:]
-        directory = os.path.abspath(os.path.join(settings.SHARE_ROOT, param))
+        share_root = os.path.abspath(settings.SHARE_ROOT)
+        directory = os.path.abspath(os.path.join(share_root, param))
 
-        if directory.startswith(settings.SHARE_ROOT) and os.path.isdir(directory):
+        # a plain prefix check would also accept siblings like "<share_root>_other"
+        if os.path.commonpath([directory, share_root]) == share_root and os.path.isdir(directory):
             data = []
-            content = os.scandir(directory)
-            for entry in content:
-                entry_type = None
-                if entry.is_file():
-                    entry_type = "REG"
-                elif entry.is_dir():
-                    entry_type = "DIR"
-
-                if entry_type:
-                    data.append({"name": entry.name, "type": entry_type})
-
-            serializer = FileInfoSerializer(many=True, data=data)
-            if serializer.is_valid(raise_exception=True):
-                return Response(serializer.data)
+            # is_file() / is_dir() use d_type from the directory listing and
+            # only stat() entries which are symlinks (or have an unknown type)
+            with os.scandir(directory) as content:
+                for entry in content:
+                    if entry.is_file():
+                        data.append({"name": entry.name, "type": "REG"})
+                    elif entry.is_dir():
+                        data.append({"name": entry.name, "type": "DIR"})
+
+            return Response(data)
         else:
             return Response("{} is an invalid directory".format(param),
                 status=status.HTTP_400_BAD_REQUEST)
@@ -213,7 +215,7 @@ class ProjectFilter(filters.FilterSet):
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
     owner = filters.CharFilter(field_name="owner__username", lookup_expr="icontains")
     assignee = filters.CharFilter(field_name="assignee__username", lookup_expr="icontains")
-    status = filters.CharFilter(field_name="status", lookup_expr="icontains")
+    status = filters.CharFilter(field_name="status", lookup_expr="exact")
 
     class Meta:
         model = models.Project
@@ -237,9 +239,11 @@ class ProjectFilter(filters.FilterSet):
 @method_decorator(name='destroy', decorator=swagger_auto_schema(operation_summary='Method deletes a specific project'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(operation_summary='Methods does a partial update of chosen fields in a project'))
 class ProjectViewSet(viewsets.ModelViewSet):
-    queryset = models.Project.objects.prefetch_related(Prefetch('label_set',
-        queryset=models.Label.objects.order_by('id')
-    ))
+    queryset = models.Project.objects.select_related('owner', 'assignee',
+        'organization', 'training_project').prefetch_related(
+            Prefetch('label_set', queryset=models.Label.objects.order_by('id')),
+            'label_set__attributespec_set',
+        )
 
     search_fields = ("name", "owner__username", "assignee__username", "status")
     filterset_class = ProjectFilter
@@ -258,9 +262,19 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # ProjectSerializer renders only ids, subsets and dimension of
+            # tasks. Other actions (e.g. exports) need full task objects.
+            queryset = queryset.prefetch_related(
+                Prefetch('tasks', queryset=models.Task.objects.order_by('id') \
+                    .only('id', 'project_id', 'subset', 'dimension')))
         if self.action == 'list':
             perm = ProjectPermission('list', self.request, self)
             queryset = perm.filter(queryset)
+            if self.request.query_params.get("names_only") == "true":
+                # ProjectSearchSerializer renders only these fields
+                queryset = queryset.select_related(None).prefetch_related(None) \
+                    .only('id', 'name')
         return queryset
 
     def perform_create(self, serializer):
@@ -274,7 +288,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['GET'], serializer_class=TaskSerializer)
     def tasks(self, request, pk):
         self.get_object() # force to call check_object_permissions
-        queryset = Task.objects.filter(project_id=pk).order_by('-id')
+        # reuse joins and prefetches which are required by TaskSerializer
+        queryset = TaskViewSet.queryset.filter(project_id=pk)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -339,13 +354,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 if rq_job is None:
                     return Response(status=status.HTTP_404_NOT_FOUND)
                 elif rq_job.is_finished:
-                    os.close(rq_job.meta['tmp_file_descriptor'])
-                    os.remove(rq_job.meta['tmp_file'])
                     rq_job.delete()
                     return Response(status=status.HTTP_201_CREATED)
                 elif rq_job.is_failed:
-                    os.close(rq_job.meta['tmp_file_descriptor'])
-                    os.remove(rq_job.meta['tmp_file'])
+                    _remove_rq_job_tmp_file(rq_job)
                     rq_job.delete()
                     return Response(
                         data=str(rq_job.exc_info),
@@ -416,19 +428,18 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     @staticmethod
     def _get_rq_response(queue, job_id):
-        queue = django_rq.get_queue(queue)
-        job = queue.fetch_job(job_id)
+        job_status, job_meta, job_exc_info = _fetch_rq_job_state(queue, job_id)
         response = {}
-        if job is None or job.is_finished:
+        if job_status is None or job_status == JobStatus.FINISHED:
             response = { "state": "Finished" }
-        elif job.is_queued:
+        elif job_status == JobStatus.QUEUED:
             response = { "state": "Queued" }
-        elif job.is_failed:
-            response = { "state": "Failed", "message": job.exc_info }
+        elif job_status == JobStatus.FAILED:
+            response = { "state": "Failed", "message": job_exc_info }
         else:
             response = { "state": "Started" }
-            response['message'] = job.meta.get('status', '')
-            response['progress'] = job.meta.get('progress', 0.)
+            response['message'] = job_meta.get('status', '')
+            response['progress'] = job_meta.get('progress', 0.)
 
         return response
 
@@ -469,8 +480,15 @@ class DataChunkGetter:
 
             # TODO: av.FFmpegError processing
             if settings.USE_CACHE and db_data.storage_method == StorageMethodChoice.CACHE:
-                buff, mime_type = frame_provider.get_chunk(self.number, self.quality)
-                return HttpResponse(buff.getvalue(), content_type=mime_type)
+                # chunks of a data object are never changed after the creation,
+                # so clients can revalidate them using a stable ETag
+                etag = quote_etag('{}-{}-{}'.format(db_data.id, self.number, self.quality.value))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    buff, mime_type = frame_provider.get_chunk(self.number, self.quality)
+                    response = FileResponse(buff, content_type=mime_type)
+                response['ETag'] = etag
+                return response
 
             # Follow symbol links if the chunk is a link on a real image otherwise
             # mimetype detection inside sendfile will work incorrectly.
@@ -493,16 +511,22 @@ class DataChunkGetter:
                 raise ValidationError('The frame number should be in ' +
                     f'[{start}, {stop}] range')
 
-            image = Image.objects.get(data_id=db_data.id, frame=self.number)
-            for i in image.related_files.all():
-                path = os.path.realpath(str(i.path))
-                image = cv2.imread(path)
-                success, result = cv2.imencode('.JPEG', image)
-                if not success:
-                    raise Exception('Failed to encode image to ".jpeg" format')
-                return HttpResponse(io.BytesIO(result.tobytes()), content_type='image/jpeg')
-            return Response(data='No context image related to the frame',
-                status=status.HTTP_404_NOT_FOUND)
+            related_file = RelatedFile.objects.filter(primary_image__data_id=db_data.id,
+                primary_image__frame=self.number).only('path').first()
+            if related_file is None:
+                return Response(data='No context image related to the frame',
+                    status=status.HTTP_404_NOT_FOUND)
+
+            path = os.path.realpath(str(related_file.path))
+            # JPEG files can be sent as is, without decoding and encoding them again
+            if mimetypes.guess_type(path)[0] == 'image/jpeg':
+                return sendfile(request, path, mimetype='image/jpeg')
+
+            image = cv2.imread(path)
+            success, result = cv2.imencode('.JPEG', image)
+            if not success:
+                raise Exception('Failed to encode image to ".jpeg" format')
+            return HttpResponse(result.tobytes(), content_type='image/jpeg')
         else:
             return Response(data='unknown data type {}.'.format(self.type),
                 status=status.HTTP_400_BAD_REQUEST)
@@ -511,8 +535,8 @@ class TaskFilter(filters.FilterSet):
     project = filters.CharFilter(field_name="project__name", lookup_expr="icontains")
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
     owner = filters.CharFilter(field_name="owner__username", lookup_expr="icontains")
-    mode = filters.CharFilter(field_name="mode", lookup_expr="icontains")
-    status = filters.CharFilter(field_name="status", lookup_expr="icontains")
+    mode = filters.CharFilter(field_name="mode", lookup_expr="exact")
+    status = filters.CharFilter(field_name="status", lookup_expr="exact")
     assignee = filters.CharFilter(field_name="assignee__username", lookup_expr="icontains")
 
     class Meta:
@@ -550,9 +574,13 @@ class DjangoFilterInspector(CoreAPICompatInspector):
 @method_decorator(name='destroy', decorator=swagger_auto_schema(operation_summary='Method deletes a specific task, all attached jobs, annotations, and data'))
 @method_decorator(name='partial_update', decorator=swagger_auto_schema(operation_summary='Methods does a partial update of chosen fields in a task'))
 class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
-    queryset = Task.objects.prefetch_related(
+    queryset = Task.objects.select_related('owner', 'assignee',
+            'organization', 'project', 'data').prefetch_related(
             Prefetch('label_set', queryset=models.Label.objects.order_by('id')),
             "label_set__attributespec_set",
+            # TaskSerializer renders labels of the project for tasks inside a project
+            Prefetch('project__label_set', queryset=models.Label.objects.order_by('id')),
+            "project__label_set__attributespec_set",
             "segment_set__job_set",
         ).order_by('-id')
     serializer_class = TaskSerializer
@@ -560,12 +588,19 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
     filterset_class = TaskFilter
     ordering_fields = ("id", "name", "owner", "status", "assignee", "subset")
     iam_organization_field = 'organization'
+    # These actions use the task only to check permissions and to read
+    # a few fields of it, the labels and jobs are fetched separately
+    permission_only_actions = ('jobs', 'data', 'annotations', 'status',
+        'dataset_export')
 
     def get_queryset(self):
         queryset = super().get_queryset()
         if self.action == 'list':
             perm = TaskPermission('list', self.request, self)
             queryset = perm.filter(queryset)
+        elif self.action in self.permission_only_actions:
+            queryset = queryset.prefetch_related(None).select_related(
+                'project__owner', 'project__assignee', 'project__organization')
 
         return queryset
 
@@ -578,32 +613,34 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
         db_task = self.get_object() # force to call check_object_permissions
         return backup.export(db_task, request)
 
+    @staticmethod
+    def _touch_projects(*project_ids):
+        # Only updated_date of the projects must be changed here, a single
+        # UPDATE avoids full saves of the projects and their post_save signals
+        project_ids = set(project_ids) - {None}
+        if project_ids:
+            models.Project.objects.filter(pk__in=project_ids) \
+                .update(updated_date=timezone.now())
+
     def perform_update(self, serializer):
-        instance = serializer.instance
+        # serializer.save() modifies the instance, remember the previous project
+        prev_project_id = serializer.instance.project_id
         updated_instance = serializer.save()
-        if instance.project:
-            instance.project.save()
-        if updated_instance.project:
-            updated_instance.project.save()
+        self._touch_projects(prev_project_id, updated_instance.project_id)
 
     def perform_create(self, serializer):
         instance = serializer.save(owner=self.request.user,
             organization=self.request.iam_context['organization'])
         if instance.project:
-            db_project = instance.project
-            db_project.save()
-            assert instance.organization == db_project.organization
+            assert instance.organization == instance.project.organization
+            self._touch_projects(instance.project_id)
 
     def perform_destroy(self, instance):
-        task_dirname = instance.get_task_dirname()
+        # Task and data directories are removed by post_delete receivers
         super().perform_destroy(instance)
-        shutil.rmtree(task_dirname, ignore_errors=True)
         if instance.data and not instance.data.tasks.all():
-            shutil.rmtree(instance.data.get_data_dirname(), ignore_errors=True)
             instance.data.delete()
-        if instance.project:
-            db_project = instance.project
-            db_project.save()
+        self._touch_projects(instance.project_id)
 
     @swagger_auto_schema(
         method='get',
@@ -623,28 +660,32 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
         task_data = db_task.data
         serializer = DataSerializer(task_data, data=request.data)
         serializer.is_valid(raise_exception=True)
-        data = dict(serializer.validated_data.items())
         uploaded_files = task_data.get_uploaded_files()
-        uploaded_files.extend(data.get('client_files'))
+        uploaded_files.extend(serializer.validated_data.get('client_files'))
         serializer.validated_data.update({'client_files': uploaded_files})
 
         db_data = serializer.save()
         db_task.data = db_data
-        db_task.save()
-        data = {k: v for k, v in serializer.data.items()}
+        db_task.save(update_fields=['data', 'updated_date'])
+        # the copy is extended with options for task creation, which
+        # mustn't get into the response
+        data = dict(serializer.data)
 
         data['use_zip_chunks'] = serializer.validated_data['use_zip_chunks']
         data['use_cache'] = serializer.validated_data['use_cache']
         data['copy_data'] = serializer.validated_data['copy_data']
+        update_fields = set()
         if data['use_cache']:
-            db_task.data.storage_method = StorageMethodChoice.CACHE
-            db_task.data.save(update_fields=['storage_method'])
+            db_data.storage_method = StorageMethodChoice.CACHE
+            update_fields.add('storage_method')
         if data['server_files'] and not data.get('copy_data'):
-            db_task.data.storage = StorageChoice.SHARE
-            db_task.data.save(update_fields=['storage'])
+            db_data.storage = StorageChoice.SHARE
+            update_fields.add('storage')
         if db_data.cloud_storage:
-            db_task.data.storage = StorageChoice.CLOUD_STORAGE
-            db_task.data.save(update_fields=['storage'])
+            db_data.storage = StorageChoice.CLOUD_STORAGE
+            update_fields.add('storage')
+        if update_fields:
+            db_data.save(update_fields=update_fields)
             # if the value of stop_frame is 0, then inside the function we cannot know
             # the value specified by the user or it's default value from the database
         if 'stop_frame' not in serializer.validated_data:
@@ -681,10 +722,12 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
         if request.method == 'POST' or request.method == 'OPTIONS':
             task_data = db_task.data
             if not task_data:
-                task_data = Data.objects.create()
+                with transaction.atomic():
+                    task_data = Data.objects.create()
+                    db_task.data = task_data
+                    db_task.save(update_fields=['data', 'updated_date'])
+                # directories are created only for committed data objects
                 task_data.make_dirs()
-                db_task.data = task_data
-                db_task.save()
             elif task_data.size != 0:
                 return Response(data='Adding more data is not supported',
                     status=status.HTTP_400_BAD_REQUEST)
@@ -752,7 +795,7 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
                     filename=request.query_params.get("filename", "").lower(),
                 )
             else:
-                data = dm.task.get_task_data(pk)
+                data = dm.task.get_task_data(pk, db_task=db_task)
                 serializer = LabeledDataSerializer(data=data)
                 if serializer.is_valid(raise_exception=True):
                     return Response(serializer.data)
@@ -799,20 +842,19 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
 
     @staticmethod
     def _get_rq_response(queue, job_id):
-        queue = django_rq.get_queue(queue)
-        job = queue.fetch_job(job_id)
+        job_status, job_meta, job_exc_info = _fetch_rq_job_state(queue, job_id)
         response = {}
-        if job is None or job.is_finished:
+        if job_status is None or job_status == JobStatus.FINISHED:
             response = { "state": "Finished" }
-        elif job.is_queued:
+        elif job_status == JobStatus.QUEUED:
             response = { "state": "Queued" }
-        elif job.is_failed:
-            response = { "state": "Failed", "message": job.exc_info }
+        elif job_status == JobStatus.FAILED:
+            response = { "state": "Failed", "message": job_exc_info }
         else:
             response = { "state": "Started" }
-            if 'status' in job.meta:
-                response['message'] = job.meta['status']
-            response['progress'] = job.meta.get('task_progress', 0.)
+            if 'status' in job_meta:
+                response['message'] = job_meta['status']
+            response['progress'] = job_meta.get('task_progress', 0.)
 
         return response
 
@@ -822,29 +864,32 @@ class TaskViewSet(UploadMixin, viewsets.ModelViewSet):
     @action(detail=True, methods=['GET'], serializer_class=DataMetaSerializer,
         url_path='data/meta')
     def data_info(request, pk):
-        db_task = models.Task.objects.prefetch_related(
-            Prefetch('data', queryset=models.Data.objects.select_related('video').prefetch_related(
-                Prefetch('images', queryset=models.Image.objects.prefetch_related('related_files').order_by('frame'))
-            ))
-        ).get(pk=pk)
-
-        if hasattr(db_task.data, 'video'):
-            media = [db_task.data.video]
-        else:
-            media = list(db_task.data.images.all())
-
-        frame_meta = [{
-            'width': item.width,
-            'height': item.height,
-            'name': item.path,
-            'has_related_context': hasattr(item, 'related_files') and item.related_files.exists()
-        } for item in media]
-
+        db_task = models.Task.objects.select_related('data__video').get(pk=pk)
         db_data = db_task.data
-        db_data.frames = frame_meta
 
-        serializer = DataMetaSerializer(db_data)
-        return Response(serializer.data)
+        if hasattr(db_data, 'video'):
+            db_video = db_data.video
+            frame_meta = [{
+                'width': db_video.width,
+                'height': db_video.height,
+                'name': db_video.path,
+                'has_related_context': False,
+            }]
+        else:
+            # Rows are read as dictionaries with the keys of FrameMetaSerializer
+            frame_meta = models.Image.objects.filter(data_id=db_data.id) \
+                .order_by('frame').values('width', 'height').annotate(
+                    name=F('path'),
+                    has_related_context=Exists(models.RelatedFile.objects.filter(
+                        primary_image_id=OuterRef('pk'))))
+
+        # Frame meta already has the shape of FrameMetaSerializer output,
+        # so it isn't passed through the serializer, which is slow for
+        # tasks with many frames
+        db_data.frames = []
+        data = DataMetaSerializer(db_data).data
+        data['frames'] = list(frame_meta)
+        return Response(data)
 
     @swagger_auto_schema(method='get', operation_summary='Export task as a dataset in a specific format',
         manual_parameters=[
@@ -897,7 +942,9 @@ class JobFilter(filters.FilterSet):
     operation_summary='Methods does a partial update of chosen fields in a job'))
 class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
     mixins.RetrieveModelMixin, mixins.UpdateModelMixin):
-    queryset = Job.objects.all().order_by('id')
+    queryset = Job.objects.select_related('assignee', 'segment__task__data',
+        'segment__task__project', 'segment__task__owner', 'segment__task__assignee',
+        'segment__task__organization').all().order_by('id')
     filterset_class = JobFilter
     iam_organization_field = 'segment__task__organization'
 
@@ -970,7 +1017,8 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
     @action(detail=True, methods=['GET'], serializer_class=IssueReadSerializer)
     def issues(self, request, pk):
         db_job = self.get_object()
-        queryset = db_job.issues
+        queryset = db_job.issues.select_related('owner', 'assignee') \
+            .prefetch_related('comments__owner')
         serializer = IssueReadSerializer(queryset,
             context={'request': request}, many=True)
 
@@ -1002,7 +1050,9 @@ class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
             db_job.segment.stop_frame, db_job.segment.task.data)
 
 class IssueViewSet(viewsets.ModelViewSet):
-    queryset = Issue.objects.all().order_by('-id')
+    queryset = Issue.objects.select_related('owner', 'assignee').prefetch_related(
+        Prefetch('comments', queryset=Comment.objects.select_related('owner'))
+    ).all().order_by('-id')
     http_method_names = ['get', 'post', 'patch', 'delete', 'options']
     iam_organization_field = 'job__segment__task__organization'
 
@@ -1030,14 +1080,14 @@ class IssueViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['GET'], serializer_class=CommentReadSerializer)
     def comments(self, request, pk):
         db_issue = self.get_object()
-        queryset = db_issue.comments
+        queryset = db_issue.comments.all()
         serializer = CommentReadSerializer(queryset,
             context={'request': request}, many=True)
 
         return Response(serializer.data)
 
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all().order_by('-id')
+    queryset = Comment.objects.select_related('owner').all().order_by('-id')
     http_method_names = ['get', 'post', 'patch', 'delete', 'options']
     iam_organization_field = 'issue__job__segment__task__organization'
 
@@ -1172,10 +1222,12 @@ class CloudStorageFilter(filters.FilterSet):
 )
 class CloudStorageViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
-    queryset = CloudStorageModel.objects.all().prefetch_related('data').order_by('-id')
+    queryset = CloudStorageModel.objects.select_related('owner') \
+        .prefetch_related('manifests').all().order_by('-id')
     search_fields = ('provider_type', 'display_name', 'resource', 'credentials_type', 'owner__username', 'description')
     filterset_class = CloudStorageFilter
     iam_organization_field = 'organization'
+    provider_types = frozenset(CloudProviderChoice.list())
 
     def get_serializer_class(self):
         if self.request.method in ("POST", "PATCH"):
@@ -1191,7 +1243,7 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
 
         provider_type = self.request.query_params.get('provider_type', None)
         if provider_type:
-            if provider_type in CloudProviderChoice.list():
+            if provider_type in self.provider_types:
                 return queryset.filter(provider_type=provider_type)
             raise ValidationError('Unsupported type of cloud provider')
         return queryset
@@ -1251,17 +1303,7 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
         storage = None
         try:
             db_storage = self.get_object()
-            credentials = Credentials()
-            credentials.convert_from_db({
-                'type': db_storage.credentials_type,
-                'value': db_storage.credentials,
-            })
-            details = {
-                'resource': db_storage.resource,
-                'credentials': credentials,
-                'specific_attributes': db_storage.get_specific_attributes()
-            }
-            storage = get_cloud_storage_instance(cloud_provider=db_storage.provider_type, **details)
+            storage = get_cached_cloud_storage_instance(db_storage)
             if not db_storage.manifests.count():
                 raise Exception('There is no manifest file')
             manifest_path = request.query_params.get('manifest_path', db_storage.manifests.first().filename)
@@ -1274,13 +1316,11 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
                     "Access to the file on the '{}' cloud storage is denied".format(db_storage.display_name), manifest_path)
 
             full_manifest_path = os.path.join(db_storage.get_storage_dirname(), manifest_path)
-            if not os.path.exists(full_manifest_path) or \
-                    datetime.utcfromtimestamp(os.path.getmtime(full_manifest_path)).replace(tzinfo=pytz.UTC) < storage.get_file_last_modified(manifest_path):
+            local_mtime = _get_file_mtime(full_manifest_path)
+            if local_mtime is None or \
+                    local_mtime < storage.get_file_last_modified(manifest_path).timestamp():
                 storage.download_file(manifest_path, full_manifest_path)
-            manifest = ImageManifestManager(full_manifest_path, db_storage.get_storage_dirname())
-            # need to update index
-            manifest.set_index()
-            manifest_files = manifest.data
+            manifest_files = _get_manifest_files(full_manifest_path, db_storage.get_storage_dirname())
             return Response(data=manifest_files, content_type="text/plain")
 
         except CloudStorageModel.DoesNotExist:
@@ -1315,25 +1355,25 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
         storage = None
         try:
             db_storage = self.get_object()
-            if not os.path.exists(db_storage.get_preview_path()):
-                credentials = Credentials()
-                credentials.convert_from_db({
-                    'type': db_storage.credentials_type,
-                    'value': db_storage.credentials,
-                })
-                details = {
-                    'resource': db_storage.resource,
-                    'credentials': credentials,
-                    'specific_attributes': db_storage.get_specific_attributes()
-                }
-                storage = get_cloud_storage_instance(cloud_provider=db_storage.provider_type, **details)
+            storage_preview_path = db_storage.get_preview_path()
+            if not os.path.exists(storage_preview_path):
+                storage = get_cached_cloud_storage_instance(db_storage)
                 if not db_storage.manifests.count():
                     raise Exception('Cannot get the cloud storage preview. There is no manifest file')
                 preview_path = None
-                for manifest_model in db_storage.manifests.all():
+                manifest_models = list(db_storage.manifests.all())
+                # requests to a cloud storage are sent concurrently, but
+                # only the manifests which are really parsed are downloaded
+                with ThreadPoolExecutor(max_workers=min(8, len(manifest_models))) as executor:
+                    manifests_last_modified = list(executor.map(
+                        functools.partial(_call_and_catch, storage.get_file_last_modified),
+                        [manifest_model.filename for manifest_model in manifest_models]))
+                for manifest_model, last_modified in zip(manifest_models, manifests_last_modified):
                     full_manifest_path = os.path.join(db_storage.get_storage_dirname(), manifest_model.filename)
-                    if not os.path.exists(full_manifest_path) or \
-                            datetime.utcfromtimestamp(os.path.getmtime(full_manifest_path)).replace(tzinfo=pytz.UTC) < storage.get_file_last_modified(manifest_model.filename):
+                    local_mtime = _get_file_mtime(full_manifest_path)
+                    if local_mtime is not None and isinstance(last_modified, Exception):
+                        raise last_modified
+                    if local_mtime is None or local_mtime < last_modified.timestamp():
                         storage.download_file(manifest_model.filename, full_manifest_path)
                     manifest = ImageManifestManager(
                         os.path.join(db_storage.get_storage_dirname(), manifest_model.filename),
@@ -1351,20 +1391,24 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
                     slogger.cloud_storage[pk].info(msg)
                     return HttpResponseBadRequest(msg)
 
-                file_status = storage.get_file_status(preview_path)
-                if file_status == Status.NOT_FOUND:
-                    raise FileNotFoundError(errno.ENOENT,
-                        "Not found on the cloud storage {}".format(db_storage.display_name), preview_path)
-                elif file_status == Status.FORBIDDEN:
-                    raise PermissionError(errno.EACCES,
-                        "Access to the file on the '{}' cloud storage is denied".format(db_storage.display_name), preview_path)
                 with NamedTemporaryFile() as temp_image:
-                    storage.download_file(preview_path, temp_image.name)
+                    try:
+                        storage.download_file(preview_path, temp_image.name)
+                    except Exception:
+                        # the status is requested only to describe the error
+                        file_status = storage.get_file_status(preview_path)
+                        if file_status == Status.NOT_FOUND:
+                            raise FileNotFoundError(errno.ENOENT,
+                                "Not found on the cloud storage {}".format(db_storage.display_name), preview_path)
+                        elif file_status == Status.FORBIDDEN:
+                            raise PermissionError(errno.EACCES,
+                                "Access to the file on the '{}' cloud storage is denied".format(db_storage.display_name), preview_path)
+                        raise
                     reader = ImageListReader([temp_image.name])
                     preview = reader.get_preview()
-                    preview.save(db_storage.get_preview_path())
-            content_type = mimetypes.guess_type(db_storage.get_preview_path())[0]
-            return HttpResponse(open(db_storage.get_preview_path(), 'rb').read(), content_type)
+                    preview.save(storage_preview_path)
+            # previews of cloud storages are always saved as JPEG files
+            return sendfile(request, storage_preview_path, mimetype='image/jpeg')
         except CloudStorageModel.DoesNotExist:
             message = f"Storage {pk} does not exist"
             slogger.glob.error(message)
@@ -1394,17 +1438,7 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
     def status(self, request, pk):
         try:
             db_storage = self.get_object()
-            credentials = Credentials()
-            credentials.convert_from_db({
-                'type': db_storage.credentials_type,
-                'value': db_storage.credentials,
-            })
-            details = {
-                'resource': db_storage.resource,
-                'credentials': credentials,
-                'specific_attributes': db_storage.get_specific_attributes()
-            }
-            storage = get_cloud_storage_instance(cloud_provider=db_storage.provider_type, **details)
+            storage = get_cached_cloud_storage_instance(db_storage)
             storage_status = storage.get_status()
             return HttpResponse(storage_status)
         except CloudStorageModel.DoesNotExist:
@@ -1415,6 +1449,94 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
             msg = str(ex)
             return HttpResponseBadRequest(msg)
 
+UPLOAD_COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+def _fetch_rq_job_state(queue_name, job_id):
+    """Returns status, meta and exc_info of an RQ job with a single HMGET
+
+    queue.fetch_job() loads the whole job hash (including pickled arguments)
+    and every is_finished/is_queued/is_failed check reads the status again,
+    so polling a job costs several round-trips to Redis.
+    """
+    queue = django_rq.get_queue(queue_name)
+    origin, job_status, meta, exc_info = queue.connection.hmget(
+        RQJob.key_for(job_id), ('origin', 'status', 'meta', 'exc_info'))
+    if job_status is None or origin is None or origin.decode() != queue.name:
+        return None, {}, None
+
+    meta = queue.serializer.loads(meta) if meta else {}
+    if exc_info:
+        try:
+            exc_info = zlib.decompress(exc_info)
+        except zlib.error:
+            pass # RQ falls back to uncompressed values too
+        exc_info = exc_info.decode()
+
+    return job_status.decode(), meta, exc_info
+
+def _remove_file_if_exists(filename):
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+def _run_and_remove_file(func, filename, *args):
+    """Runs an RQ job function and removes its temporary input file
+    regardless of the result"""
+    try:
+        return func(*args)
+    finally:
+        _remove_file_if_exists(filename)
+
+def _remove_rq_job_tmp_file(rq_job):
+    """Removes the temporary input file of an import job. The job removes
+    it itself, unless the work-horse is killed (e.g. on timeout) or the job
+    never runs."""
+    filename = rq_job.meta.get('tmp_file')
+    if filename:
+        _remove_file_if_exists(filename)
+
+def _save_uploaded_file(uploaded_file, filename):
+    """Copies an uploaded file into the file with the given name"""
+    if isinstance(uploaded_file, TemporaryUploadedFile):
+        # big uploads are already on disk, the kernel can copy them
+        shutil.copyfile(uploaded_file.temporary_file_path(), filename)
+    else:
+        uploaded_file.seek(0)
+        with open(filename, 'wb') as f:
+            shutil.copyfileobj(uploaded_file, f, length=UPLOAD_COPY_BUFFER_SIZE)
+
+def _get_file_mtime(path):
+    """Returns the modification time of a file as a POSIX timestamp or None
+    if the file doesn't exist, with a single stat() call"""
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+def _call_and_catch(func, *args):
+    """Returns the result of a call or the raised exception, so that errors
+    of concurrent calls can be raised in the same order as sequential ones"""
+    try:
+        return func(*args)
+    except Exception as ex:
+        return ex
+
+@functools.lru_cache(maxsize=16)
+def _read_manifest_files(full_manifest_path, upload_dir, mtime_ns, size):
+    # the modification time and the size are a part of the cache key only
+    manifest = ImageManifestManager(full_manifest_path, upload_dir)
+    # need to update index
+    manifest.set_index()
+    return tuple(manifest.data)
+
+def _get_manifest_files(full_manifest_path, upload_dir):
+    """Returns names of files from a manifest. Parsed manifests are cached
+    until the manifest file is replaced or changed."""
+    manifest_stat = os.stat(full_manifest_path)
+    return _read_manifest_files(full_manifest_path, upload_dir,
+        manifest_stat.st_mtime_ns, manifest_stat.st_size)
+
 def rq_handler(job, exc_type, exc_value, tb):
     job.exc_info = "".join(
         traceback.format_exception_only(exc_type, exc_value))
@@ -1434,8 +1556,7 @@ def rq_handler(job, exc_type, exc_value, tb):
 #     tags=['tasks'])
 # @api_view(['PUT'])
 def _import_annotations(request, rq_id, rq_func, pk, format_name):
-    format_desc = {f.DISPLAY_NAME: f
-        for f in dm.views.get_import_formats()}.get(format_name)
+    format_desc = dm.views.find_import_format(format_name)
     if format_desc is None:
         raise serializers.ValidationError(
             "Unknown input format '{}'".format(format_name))
@@ -1450,29 +1571,31 @@ def _import_annotations(request, rq_id, rq_func, pk, format_name):
         if serializer.is_valid(raise_exception=True):
             anno_file = serializer.validated_data['annotation_file']
             fd, filename = mkstemp(prefix='cvat_{}'.format(pk))
-            with open(filename, 'wb+') as f:
-                for chunk in anno_file.chunks():
-                    f.write(chunk)
-
-            av_scan_paths(filename)
-            rq_job = queue.enqueue_call(
-                func=rq_func,
-                args=(pk, filename, format_name),
-                job_id=rq_id
-            )
-            rq_job.meta['tmp_file'] = filename
-            rq_job.meta['tmp_file_descriptor'] = fd
-            rq_job.save_meta()
+            # the descriptor can't be kept for status requests, they can be
+            # served by another process
+            os.close(fd)
+            try:
+                _save_uploaded_file(anno_file, filename)
+                av_scan_paths(filename)
+                # the worker removes the file when the import is done
+                rq_job = queue.enqueue_call(
+                    func=_run_and_remove_file,
+                    args=(rq_func, filename, pk, filename, format_name),
+                    job_id=rq_id,
+                    meta={
+                        'tmp_file': filename,
+                    },
+                )
+            except Exception:
+                _remove_file_if_exists(filename)
+                raise
     else:
         if rq_job.is_finished:
-            os.close(rq_job.meta['tmp_file_descriptor'])
-            os.remove(rq_job.meta['tmp_file'])
             rq_job.delete()
             return Response(status=status.HTTP_201_CREATED)
         elif rq_job.is_failed:
-            os.close(rq_job.meta['tmp_file_descriptor'])
-            os.remove(rq_job.meta['tmp_file'])
             exc_info = str(rq_job.exc_info)
+            _remove_rq_job_tmp_file(rq_job)
             rq_job.delete()
 
             # RQ adds a prefix with exception class name
@@ -1493,8 +1616,7 @@ def _export_annotations(db_instance, rq_id, request, format_name, action, callba
         raise serializers.ValidationError(
             "Unexpected action specified for the request")
 
-    format_desc = {f.DISPLAY_NAME: f
-        for f in dm.views.get_export_formats()}.get(format_name)
+    format_desc = dm.views.find_export_format(format_name)
     if format_desc is None:
         raise serializers.ValidationError(
             "Unknown format specified for the request")
@@ -1507,8 +1629,11 @@ def _export_annotations(db_instance, rq_id, request, format_name, action, callba
     if rq_job:
         last_instance_update_time = timezone.localtime(db_instance.updated_date)
         if isinstance(db_instance, Project):
-            tasks_update = list(map(lambda db_task: timezone.localtime(db_task.updated_date), db_instance.tasks.all()))
-            last_instance_update_time = max(tasks_update + [last_instance_update_time])
+            tasks_update_time = db_instance.tasks.aggregate(
+                last_update_time=Max('updated_date'))['last_update_time']
+            if tasks_update_time is not None:
+                last_instance_update_time = max(last_instance_update_time,
+                    timezone.localtime(tasks_update_time))
         request_time = rq_job.meta.get('request_time', None)
         if request_time is None or request_time < last_instance_update_time:
             rq_job.cancel()
@@ -1555,8 +1680,7 @@ def _export_annotations(db_instance, rq_id, request, format_name, action, callba
     return Response(status=status.HTTP_202_ACCEPTED)
 
 def _import_project_dataset(request, rq_id, rq_func, pk, format_name):
-    format_desc = {f.DISPLAY_NAME: f
-        for f in dm.views.get_import_formats()}.get(format_name)
+    format_desc = dm.views.find_import_format(format_name)
     if format_desc is None:
         raise serializers.ValidationError(
             "Unknown input format '{}'".format(format_name))
@@ -1571,19 +1695,21 @@ def _import_project_dataset(request, rq_id, rq_func, pk, format_name):
         if serializer.is_valid(raise_exception=True):
             dataset_file = serializer.validated_data['dataset_file']
             fd, filename = mkstemp(prefix='cvat_{}'.format(pk))
-            with open(filename, 'wb+') as f:
-                for chunk in dataset_file.chunks():
-                    f.write(chunk)
-
-            rq_job = queue.enqueue_call(
-                func=rq_func,
-                args=(pk, filename, format_name),
-                job_id=rq_id,
-                meta={
-                    'tmp_file': filename,
-                    'tmp_file_descriptor': fd,
-                },
-            )
+            os.close(fd)
+            try:
+                _save_uploaded_file(dataset_file, filename)
+                # the worker removes the file when the import is done
+                rq_job = queue.enqueue_call(
+                    func=_run_and_remove_file,
+                    args=(rq_func, filename, pk, filename, format_name),
+                    job_id=rq_id,
+                    meta={
+                        'tmp_file': filename,
+                    },
+                )
+            except Exception:
+                _remove_file_if_exists(filename)
+                raise
     else:
         return Response(status=status.HTTP_409_CONFLICT, data='Import job already exists')
 
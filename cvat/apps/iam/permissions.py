@@ -71,14 +71,18 @@ class OpenPolicyAgentPermission:
 
         if qobjects:
             assert len(qobjects) == 1
-        else:
-            qobjects.append(Q())
+        if not qobjects or not qobjects[0]:
+            # there are no restrictions (e.g. for admins)
+            return queryset
 
         # By default, a QuerySet will not eliminate duplicate rows. If your
         # query spans multiple tables (e.g. members__user_id, owner_id), it’s
         # possible to get duplicate results when a QuerySet is evaluated.
-        # That’s when you’d use distinct().
-        return queryset.filter(qobjects[0]).distinct()
+        # Visible objects are selected by a subquery on primary keys instead
+        # of distinct(), which would have to compare whole rows (including
+        # select_related columns) and to sort them before the pagination.
+        visible_ids = queryset.model.objects.filter(qobjects[0]).values('pk')
+        return queryset.filter(pk__in=visible_ids)
 
 class OrganizationPermission(OpenPolicyAgentPermission):
     @classmethod
@@ -0,0 +1,81 @@
+# Copyright (C) 2022 Intel Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.test import TestCase
+
+from cvat.apps.engine.models import Project
+from cvat.apps.iam.permissions import OpenPolicyAgentPermission
+from cvat.apps.organizations.models import Membership, Organization
+
+
+class _TestPermission(OpenPolicyAgentPermission):
+    url = 'http://opa:8181/v1/data/projects/allow'
+
+class OpenPolicyAgentFilterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user')
+        cls.others = [User.objects.create_user(username='other{}'.format(i))
+            for i in range(3)]
+
+        cls.org = Organization.objects.create(slug='org', owner=cls.others[0])
+        for member in [cls.user] + cls.others:
+            Membership.objects.create(user=member, organization=cls.org,
+                is_active=True, role=Membership.WORKER)
+        cls.other_org = Organization.objects.create(slug='other_org', owner=cls.others[0])
+        Membership.objects.create(user=cls.others[0], organization=cls.other_org,
+            is_active=True, role=Membership.WORKER)
+
+        Project.objects.create(name='own project', owner=cls.user)
+        Project.objects.create(name='own project in org', owner=cls.user,
+            organization=cls.org)
+        Project.objects.create(name='assigned project in org', owner=cls.others[1],
+            assignee=cls.user, organization=cls.org)
+        Project.objects.create(name='other project in org', owner=cls.others[1],
+            organization=cls.org)
+        Project.objects.create(name='project in other org', owner=cls.others[0],
+            organization=cls.other_org)
+
+    def _filter(self, rules, queryset):
+        request = mock.Mock(user=self.user, iam_context={
+            'privilege': None, 'organization': None, 'membership': None})
+        perm = _TestPermission(request, view=None, obj=None)
+        with mock.patch('cvat.apps.iam.permissions.requests.post') as post:
+            post.return_value.json.return_value = {'result': rules}
+            return perm.filter(queryset)
+
+    def test_filter_matches_distinct_for_multi_join_rules(self):
+        uid = self.user.id
+        rules = [
+            {'owner_id': uid}, {'assignee_id': uid}, '|',
+            {'organization__members__user_id': uid}, '|',
+            {'organization__members__is_active': True}, '&',
+        ]
+        q = ((Q(owner_id=uid) | Q(assignee_id=uid)) | Q(organization__members__user_id=uid)) \
+            & Q(organization__members__is_active=True)
+        queryset = Project.objects.select_related('owner', 'assignee').order_by('id')
+
+        # the joins really produce duplicate rows
+        self.assertGreater(queryset.filter(q).count(), queryset.filter(q).distinct().count())
+
+        filtered = self._filter(rules, queryset)
+        self.assertEqual(list(filtered), list(queryset.filter(q).distinct()))
+        self.assertEqual(filtered.count(), queryset.filter(q).distinct().count())
+
+    def test_filter_supports_negation(self):
+        uid = self.user.id
+        rules = [{'organization__members__user_id': uid}, {'owner_id': uid}, '~', '&']
+        q = Q(organization__members__user_id=uid) & ~Q(owner_id=uid)
+        queryset = Project.objects.order_by('id')
+
+        self.assertEqual(list(self._filter(rules, queryset)),
+            list(queryset.filter(q).distinct()))
+
+    def test_filter_without_restrictions_keeps_queryset(self):
+        queryset = Project.objects.order_by('id')
+        self.assertIs(self._filter([], queryset), queryset)
@@ -4,18 +4,31 @@
 
 import os.path as osp
 import glob
-import json
+import orjson
 from deepdiff import DeepDiff
 from .utils import config
 import pytest
 
+def _remove_last_login(objs):
+    if isinstance(objs, dict):
+        for obj in objs.get('results', []):
+            obj.pop('last_login', None)
+
+def _dump_sorted(objs):
+    return orjson.dumps(objs, option=orjson.OPT_SORT_KEYS)
+
 @pytest.mark.parametrize('path', glob.glob(osp.join(config.ASSETS_DIR, '*.json')))
 def test_check_objects_integrity(path):
-    with open(path) as f:
+    with open(path, 'rb') as f:
         endpoint = osp.basename(path).rsplit('.')[0]
         response = config.get_method('admin1', endpoint, page_size='all')
-        json_objs = json.load(f)
-        resp_objs = response.json()
+        json_objs = orjson.loads(f.read())
+        resp_objs = orjson.loads(response.content)
 
-        assert DeepDiff(json_objs, resp_objs, ignore_order=True,
-            exclude_regex_paths="root\['results'\]\[\d+\]\['last_login'\]") == {}
+        _remove_last_login(json_objs)
+        _remove_last_login(resp_objs)
+        # DeepDiff with ignore_order is slow, so it is used only when objects
+        # serialize differently. Unlike ==, serialization tells 1, 1.0 and
+        # True apart, as DeepDiff does.
+        if _dump_sorted(json_objs) != _dump_sorted(resp_objs):
+            assert DeepDiff(json_objs, resp_objs, ignore_order=True) == {}